@@ -1,6 +1,8 @@
 # bot.py
 import os
 import re
+import random
+import time
 import ssl
 import asyncio
 import contextlib
@@ -11,13 +13,31 @@ from discord import app_commands
 from discord.ext import commands
 
 import asyncpg
+import certifi
 from aiohttp import web  # 헬스 서버용
 
 # ========= 설정 =========
 TOKEN = os.getenv("DISCORD_TOKEN")
 DATABASE_URL = os.getenv("DATABASE_URL")  # (권장) Pooler URI + ?sslmode=require
+DIRECT_DATABASE_URL = os.getenv("DIRECT_DATABASE_URL")  # (선택) 5432 직접/세션 모드 URI. 있으면 이쪽으로 연결해 statement 캐시 사용
+DB_URL = DIRECT_DATABASE_URL or DATABASE_URL
 TEST_GUILD_ID = int(os.getenv("TEST_GUILD_ID", "0"))  # 테스트 서버 ID(선택). 있으면 길드 싱크로 즉시 반영
 PORT = int(os.getenv("PORT", "10000"))               # Web 서비스일 때만 사용
+PG_POOL_MIN = int(os.getenv("PG_POOL_MIN", "5"))
+PG_POOL_MAX = int(os.getenv("PG_POOL_MAX", "20"))
+
+def is_pooler_url(url:Optional[str]) -> bool:
+    """Supabase pooler(6543) / pgbouncer 경유 URL이면 prepared statement를 쓸 수 없음."""
+    return bool(url) and (":6543" in url or "pgbouncer" in url)
+
+# asyncpg는 statement_cache_size > 0 이면 연결별로 쿼리를 자동 prepare/캐시함.
+# pooler는 URL만으로 다 가려낼 수 없으므로(Neon -pooler, 5432 pgbouncer 등) 기본 0,
+# DIRECT_DATABASE_URL로 직접 연결을 명시했거나 DB_STATEMENT_CACHE_SIZE를 지정했을 때만 켬
+DB_STATEMENT_CACHE_SIZE = int(
+    os.getenv("DB_STATEMENT_CACHE_SIZE")
+    or (256 if DIRECT_DATABASE_URL and not is_pooler_url(DIRECT_DATABASE_URL) else 0)
+)
+
 COMMAND_PREFIX = "!"
 INTENTS = discord.Intents.default()
 INTENTS.message_content = True
@@ -25,19 +45,47 @@ INTENTS.members = True
 BOT = commands.Bot(command_prefix=COMMAND_PREFIX, intents=INTENTS)
 
 # ========= SSL 컨텍스트 =========
-def make_ssl_ctx() -> ssl.SSLContext:
+_SSLMODE_RE = re.compile(r"[?&]sslmode=([\w-]+)")
+
+def make_ssl_ctx(url:str) -> Optional[ssl.SSLContext]:
+    """DB 연결 시점에 한 번만 호출. URL이 verify-ca/verify-full(또는 PGSSLROOTCERT 지정)로
+    검증을 직접 요구할 때만 asyncpg에 맡기고(None), 그 외에는 검증 컨텍스트를 넘김."""
     insecure = os.getenv("DB_SSL_INSECURE", "1") == "1"  # 기본 1(테스트). 운영은 0 권장
-    ctx = ssl.create_default_context()
     if insecure:
+        ctx = ssl.create_default_context()
         ctx.check_hostname = False
         ctx.verify_mode = ssl.CERT_NONE
-    else:
-        ctx.check_hostname = True
-        ctx.verify_mode = ssl.CERT_REQUIRED
-    return ctx
+        return ctx
+    # sslmode=require 등은 asyncpg가 루트 인증서 없이 CERT_NONE으로 붙으므로 맡기지 않음
+    m = _SSLMODE_RE.search(url)
+    if (m and m.group(1) in ("verify-ca", "verify-full")) or os.getenv("PGSSLROOTCERT"):
+        return None
+    # 시스템 trust store 대신 certifi 번들로 검증 (create_default_context가 이미 CERT_REQUIRED + 호스트명 검사).
+    # DB_SSL_INSECURE=0 이면서 URL의 sslmode가 없거나 verify-* 가 아닐 때(Supabase ?sslmode=require 포함) 적용
+    return ssl.create_default_context(cafile=certifi.where())
 
-SSL_CTX = make_ssl_ctx()
 PG_POOL: Optional[asyncpg.Pool] = None
+DB_READY = False  # 풀 생성 + init_db + 캐시 적재가 모두 끝난 뒤에만 True (OWNER_TABLE 등이 비어 있는 구간 차단)
+
+# ========= 메모리 캐시 =========
+GUILD_ACTIVE: set[int] = set()  # 설정 채널이나 개인채널이 하나라도 있는 길드. 없으면 on_message가 바로 반환
+SETTINGS_CACHE: dict[int, tuple[float, tuple[Optional[int], Optional[int]]]] = {}  # guild_id -> (만료시각, (nick_ch, create_ch))
+SETTINGS_TTL = 300.0  # DB를 직접 고친 경우 등 외부 변경도 최대 5분 안에 반영
+
+def cache_settings(guild_id:int, nick_ch:Optional[int], create_ch:Optional[int]):
+    SETTINGS_CACHE[guild_id] = (time.monotonic() + SETTINGS_TTL, (nick_ch, create_ch))
+
+def cached_settings(guild_id:int) -> Optional[tuple[Optional[int], Optional[int]]]:
+    entry = SETTINGS_CACHE.get(guild_id)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+OWNER_TABLE: dict[int, int] = {}  # channel_id -> owner_id. personal_channels 전체를 시작 시 적재, 쓰기 경로에서 함께 갱신
+
+# 개인채널 대시보드용 (쓰기 경로에서 함께 갱신하는 write-through)
+BLOG_CACHE: dict[int, list[tuple[str, Optional[str]]]] = {}  # channel_id -> [(url, title), ...]
+DASHBOARD_CACHE: dict[int, Optional[int]] = {}               # channel_id -> dashboard message_id
 
 # ========= DB 유틸 =========
 SCHEMA_SQL = """
@@ -50,8 +98,8 @@ CREATE TABLE IF NOT EXISTS guild_settings(
 CREATE TABLE IF NOT EXISTS personal_channels(
     channel_id BIGINT PRIMARY KEY,
     owner_id  BIGINT NOT NULL,
-    guild_id  BIGINT,
-    UNIQUE (guild_id, owner_id)
+    guild_id  BIGINT
+    -- (guild_id, owner_id) 유니크는 init_db의 커버링 인덱스로 보장
 );
 
 -- 다중 블로그 가능 + 제목 지원
@@ -66,20 +114,46 @@ CREATE TABLE IF NOT EXISTS dashboards(
     channel_id BIGINT PRIMARY KEY,
     message_id BIGINT
 );
+
+-- /블로그목록 으로 지정한 서버 대시보드 (재시작 후에도 유지)
+CREATE TABLE IF NOT EXISTS server_dashboards(
+    guild_id   BIGINT PRIMARY KEY,
+    channel_id BIGINT NOT NULL,
+    message_id BIGINT
+);
+
+CREATE TABLE IF NOT EXISTS schema_version(
+    version INT PRIMARY KEY
+);
 """
 
+# 스키마/마이그레이션을 바꾸면 올릴 것
+SCHEMA_VERSION = 3
+
 async def init_db():
-    """스키마 생성 + 기존 설치 자동 마이그레이션(무중단)"""
+    """스키마 생성 + 기존 설치 자동 마이그레이션(무중단). 이미 최신 버전이면 DDL 생략."""
     async with PG_POOL.acquire() as con:
+        with contextlib.suppress(asyncpg.UndefinedTableError):
+            if (await con.fetchval("SELECT max(version) FROM schema_version") or 0) >= SCHEMA_VERSION:
+                return
         async with con.transaction():
             await con.execute(SCHEMA_SQL)
 
             # personal_channels 마이그레이션(길드 기준 유니크)
             await con.execute("ALTER TABLE personal_channels ADD COLUMN IF NOT EXISTS guild_id BIGINT;")
             await con.execute("ALTER TABLE personal_channels DROP CONSTRAINT IF EXISTS personal_channels_owner_id_key;")
+            # channel_id를 INCLUDE 해서 get_channel_by_owner가 index-only scan 가능
+            await con.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS personal_channels_guild_owner_cov_idx
+                ON personal_channels(guild_id, owner_id) INCLUDE (channel_id);
+            """)
+            # 커버링 인덱스와 중복되는 예전 유니크 인덱스/제약 정리
+            await con.execute("DROP INDEX IF EXISTS personal_channels_guild_owner_idx;")
+            await con.execute("ALTER TABLE personal_channels DROP CONSTRAINT IF EXISTS personal_channels_guild_id_owner_id_key;")
+            # 레거시(guild_id NULL) 행을 owner_id로 찾는 get_channel_by_owner 보정 경로용 부분 인덱스
             await con.execute("""
-                CREATE UNIQUE INDEX IF NOT EXISTS personal_channels_guild_owner_idx
-                ON personal_channels(guild_id, owner_id);
+                CREATE INDEX IF NOT EXISTS personal_channels_legacy_owner_idx
+                ON personal_channels(owner_id) WHERE guild_id IS NULL;
             """)
 
             # blog 마이그레이션: title 추가 + 채널당 다중 허용을 위해 PK 교체
@@ -89,81 +163,189 @@ async def init_db():
             # 복합 PK 보장
             await con.execute("ALTER TABLE blog ADD PRIMARY KEY (channel_id, url);")
 
-async def get_settings(guild_id:int):
-    async with PG_POOL.acquire() as con:
-        row = await con.fetchrow(
-            "SELECT nick_channel_id, create_channel_id FROM guild_settings WHERE guild_id=$1",
-            guild_id
-        )
-    return (row["nick_channel_id"], row["create_channel_id"]) if row else (None, None)
-
-async def set_setting(guild_id:int, key:str, value:Optional[int]):
-    async with PG_POOL.acquire() as con:
-        async with con.transaction():
-            await con.execute(
-                "INSERT INTO guild_settings(guild_id) VALUES($1) ON CONFLICT (guild_id) DO NOTHING",
-                guild_id
-            )
-            await con.execute(
-                f"UPDATE guild_settings SET {key}=$1 WHERE guild_id=$2",
-                value, guild_id
-            )
-
-async def set_personal_channel(channel_id:int, owner_id:int, guild_id:int):
-    async with PG_POOL.acquire() as con:
-        await con.execute(
-            "INSERT INTO personal_channels(channel_id, owner_id, guild_id) VALUES($1,$2,$3) "
-            "ON CONFLICT (channel_id) DO UPDATE SET owner_id=EXCLUDED.owner_id, guild_id=EXCLUDED.guild_id",
-            channel_id, owner_id, guild_id
-        )
+            await con.execute("DELETE FROM schema_version")
+            await con.execute("INSERT INTO schema_version(version) VALUES($1)", SCHEMA_VERSION)
+
+async def get_settings(guild_id:int, *, con:Optional[asyncpg.Connection] = None):
+    """길드 설정 조회. 메시지마다 호출되므로 캐시 우선, 미스일 때만 DB 조회."""
+    cached = cached_settings(guild_id)
+    if cached is not None:
+        return cached
+    row = await (con or PG_POOL).fetchrow(
+        "SELECT nick_channel_id, create_channel_id FROM guild_settings WHERE guild_id=$1",
+        guild_id
+    )
+    settings = (row["nick_channel_id"], row["create_channel_id"]) if row else (None, None)
+    cache_settings(guild_id, *settings)
+    return settings
+
+async def load_active_guilds(*, con:Optional[asyncpg.Connection] = None):
+    """시작 시 기능을 쓰는 길드 목록을 채움."""
+    rows = await (con or PG_POOL).fetch(
+        """
+        SELECT guild_id FROM guild_settings
+        WHERE nick_channel_id IS NOT NULL OR create_channel_id IS NOT NULL
+        UNION
+        SELECT guild_id FROM personal_channels WHERE guild_id IS NOT NULL
+        """
+    )
+    GUILD_ACTIVE.update(r["guild_id"] for r in rows)
+    # 레거시(guild_id NULL) 개인채널은 실제 채널로 길드를 확인
+    legacy = await (con or PG_POOL).fetch("SELECT channel_id FROM personal_channels WHERE guild_id IS NULL")
+    for r in legacy:
+        ch = BOT.get_channel(r["channel_id"])
+        if ch and getattr(ch, "guild", None):
+            GUILD_ACTIVE.add(ch.guild.id)
+
+async def load_settings(*, con:Optional[asyncpg.Connection] = None):
+    """시작 시 guild_settings 전체를 한 번에 읽어 캐시를 채움."""
+    rows = await (con or PG_POOL).fetch("SELECT guild_id, nick_channel_id, create_channel_id FROM guild_settings")
+    for r in rows:
+        cache_settings(r["guild_id"], r["nick_channel_id"], r["create_channel_id"])
+
+SETTING_KEYS = frozenset({"nick_channel_id", "create_channel_id"})
+
+async def set_setting(guild_id:int, key:str, value:Optional[int], *, con:Optional[asyncpg.Connection] = None):
+    if key not in SETTING_KEYS:  # 컬럼명을 f-string으로 넣으므로 화이트리스트 검사
+        raise ValueError(f"unknown setting: {key}")
+    row = await (con or PG_POOL).fetchrow(
+        f"INSERT INTO guild_settings(guild_id, {key}) VALUES($1,$2) "
+        f"ON CONFLICT (guild_id) DO UPDATE SET {key}=EXCLUDED.{key} "
+        "RETURNING nick_channel_id, create_channel_id",
+        guild_id, value
+    )
+    cache_settings(guild_id, row["nick_channel_id"], row["create_channel_id"])
+    if value is not None:
+        GUILD_ACTIVE.add(guild_id)
+
+async def set_personal_channel(channel_id:int, owner_id:int, guild_id:int, *, con:Optional[asyncpg.Connection] = None) -> bool:
+    """(guild_id, owner_id) 유니크 제약으로 개인채널 등록. 이미 채널이 있으면 False."""
+    claimed = await (con or PG_POOL).fetchval(
+        "INSERT INTO personal_channels(channel_id, owner_id, guild_id) VALUES($1,$2,$3) "
+        "ON CONFLICT (guild_id, owner_id) DO NOTHING RETURNING channel_id",
+        channel_id, owner_id, guild_id
+    )
+    if claimed is None:
+        return False
+    OWNER_TABLE[channel_id] = owner_id
+    GUILD_ACTIVE.add(guild_id)
+    return True
+
+async def load_owners(*, con:Optional[asyncpg.Connection] = None):
+    """시작 시 personal_channels 전체(channel_id -> owner_id)를 메모리에 올림."""
+    rows = await (con or PG_POOL).fetch("SELECT channel_id, owner_id FROM personal_channels")
+    OWNER_TABLE.clear()
+    OWNER_TABLE.update((r["channel_id"], r["owner_id"]) for r in rows)
 
 async def get_owner(channel_id:int) -> Optional[int]:
-    async with PG_POOL.acquire() as con:
-        row = await con.fetchrow(
-            "SELECT owner_id FROM personal_channels WHERE channel_id=$1", channel_id
-        )
-    return int(row["owner_id"]) if row else None
+    """채널 소유자 조회. OWNER_TABLE이 테이블 전체를 들고 있으므로 DB 조회 없음."""
+    return OWNER_TABLE.get(channel_id)
 
 # --- 블로그: 다중 등록 + 제목 ---
-async def add_blog(channel_id:int, url:str, title:Optional[str]):
-    async with PG_POOL.acquire() as con:
-        await con.execute(
-            """
+# 쓰기와 같은 쿼리에서 갱신 후 목록을 돌려받아 BLOG_CACHE에 넣음 → 대시보드 갱신 시 재조회 없음.
+# (CTE의 SELECT는 쓰기 전 스냅샷을 보므로 바뀐 url은 따로 제외/추가)
+async def add_blog(channel_id:int, url:str, title:Optional[str], *, con:Optional[asyncpg.Connection] = None):
+    rows = await (con or PG_POOL).fetch(
+        """
+        WITH up AS (
             INSERT INTO blog(channel_id, url, title)
             VALUES($1,$2,$3)
             ON CONFLICT (channel_id, url) DO UPDATE SET title=EXCLUDED.title
-            """,
-            channel_id, url, title
-        )
-
-async def remove_blog(channel_id:int, url:str):
-    async with PG_POOL.acquire() as con:
-        await con.execute("DELETE FROM blog WHERE channel_id=$1 AND url=$2", channel_id, url)
-
-async def clear_blogs(channel_id:int):
-    async with PG_POOL.acquire() as con:
-        await con.execute("DELETE FROM blog WHERE channel_id=$1", channel_id)
-
-async def list_blogs(channel_id:int) -> list[tuple[str, Optional[str]]]:
-    async with PG_POOL.acquire() as con:
-        rows = await con.fetch(
-            "SELECT url, title FROM blog WHERE channel_id=$1 ORDER BY url",
-            channel_id
+            RETURNING url, title
         )
-    return [(r["url"], r["title"]) for r in rows]
-
-async def set_dashboard_message_id(channel_id:int, message_id:Optional[int]):
+        SELECT url, title FROM up
+        UNION ALL
+        SELECT url, title FROM blog WHERE channel_id=$1 AND url<>$2
+        ORDER BY url
+        """,
+        channel_id, url, title
+    )
+    BLOG_CACHE[channel_id] = [(r["url"], r["title"]) for r in rows]
+
+async def remove_blog(channel_id:int, url:str, *, con:Optional[asyncpg.Connection] = None):
+    rows = await (con or PG_POOL).fetch(
+        """
+        WITH del AS (DELETE FROM blog WHERE channel_id=$1 AND url=$2)
+        SELECT url, title FROM blog WHERE channel_id=$1 AND url<>$2
+        ORDER BY url
+        """,
+        channel_id, url
+    )
+    BLOG_CACHE[channel_id] = [(r["url"], r["title"]) for r in rows]
+
+async def clear_blogs(channel_id:int, *, con:Optional[asyncpg.Connection] = None) -> Optional[int]:
+    """채널의 블로그 전체 삭제 + 대시보드 message_id 비우기를 한 번에. 지워야 할 기존 대시보드 id 반환."""
+    old_id = await (con or PG_POOL).fetchval(
+        """
+        WITH b AS (DELETE FROM blog WHERE channel_id=$1),
+             old AS (SELECT message_id FROM dashboards WHERE channel_id=$1 FOR UPDATE)
+        UPDATE dashboards d SET message_id=NULL
+        FROM old
+        WHERE d.channel_id=$1
+        RETURNING old.message_id
+        """,
+        channel_id
+    )
+    BLOG_CACHE[channel_id] = []
+    DASHBOARD_CACHE[channel_id] = None
+    return int(old_id) if old_id is not None else None
+
+async def bulk_import_blogs(channel_id:int, items:list[tuple[str, Optional[str]]]):
+    """여러 블로그를 한 번에 등록(가져오기/마이그레이션용). COPY로 임시 테이블에 넣은 뒤 한 번에 UPSERT.
+    /블로그등록과 같은 URL 검사를 하고, 같은 url이 여러 번 있으면 마지막 항목이 남음."""
+    for url, _ in items:
+        error = blog_url_error(url)
+        if error:
+            raise ValueError(f"{error}: {url[:100]}")
+    if not items:
+        return
     async with PG_POOL.acquire() as con:
-        await con.execute(
-            "INSERT INTO dashboards(channel_id, message_id) VALUES($1,$2) "
-            "ON CONFLICT (channel_id) DO UPDATE SET message_id=EXCLUDED.message_id",
-            channel_id, message_id
-        )
+        async with con.transaction():
+            await con.execute(
+                "CREATE TEMP TABLE blog_import(ord INT NOT NULL, url TEXT NOT NULL, title TEXT) ON COMMIT DROP"
+            )
+            await con.copy_records_to_table(
+                "blog_import",
+                records=[(i, url, title) for i, (url, title) in enumerate(items)],
+                columns=["ord", "url", "title"],
+            )
+            await con.execute(
+                """
+                INSERT INTO blog(channel_id, url, title)
+                SELECT DISTINCT ON (url) $1::bigint, url, title FROM blog_import
+                ORDER BY url, ord DESC
+                ON CONFLICT (channel_id, url) DO UPDATE SET title=EXCLUDED.title
+                """,
+                channel_id
+            )
+    BLOG_CACHE.pop(channel_id, None)
+
+async def set_dashboard_message_id(channel_id:int, message_id:Optional[int], *, con:Optional[asyncpg.Connection] = None):
+    DASHBOARD_CACHE[channel_id] = message_id  # DB 쓰기 전에 갱신해서 바로 다음 조회도 새 id를 보게
+    await (con or PG_POOL).execute(
+        "INSERT INTO dashboards(channel_id, message_id) VALUES($1,$2) "
+        "ON CONFLICT (channel_id) DO UPDATE SET message_id=EXCLUDED.message_id",
+        channel_id, message_id
+    )
 
-async def get_dashboard_message_id(channel_id:int) -> Optional[int]:
-    async with PG_POOL.acquire() as con:
-        row = await con.fetchrow("SELECT message_id FROM dashboards WHERE channel_id=$1", channel_id)
-    return int(row["message_id"]) if row and row["message_id"] is not None else None
+async def get_dashboard_state(channel_id:int, *, con:Optional[asyncpg.Connection] = None) -> tuple[list[tuple[str, Optional[str]]], Optional[int]]:
+    """대시보드 갱신에 필요한 (블로그 목록, 대시보드 message_id). 캐시에 없으면 한 번의 쿼리로 둘 다 읽음."""
+    if channel_id in BLOG_CACHE and channel_id in DASHBOARD_CACHE:
+        return BLOG_CACHE[channel_id], DASHBOARD_CACHE[channel_id]
+    row = await (con or PG_POOL).fetchrow(
+        """
+        SELECT
+            (SELECT message_id FROM dashboards WHERE channel_id=$1) AS mid,
+            ARRAY(SELECT url FROM blog WHERE channel_id=$1 ORDER BY url) AS urls,
+            ARRAY(SELECT title FROM blog WHERE channel_id=$1 ORDER BY url) AS titles
+        """,
+        channel_id
+    )
+    items = list(zip(row["urls"], row["titles"]))
+    message_id = int(row["mid"]) if row["mid"] is not None else None
+    BLOG_CACHE[channel_id] = items
+    DASHBOARD_CACHE[channel_id] = message_id
+    return items, message_id
 
 async def get_channel_by_owner(guild_id:int, owner_id:int) -> Optional[int]:
     async with PG_POOL.acquire() as con:
@@ -174,58 +356,149 @@ async def get_channel_by_owner(guild_id:int, owner_id:int) -> Optional[int]:
         if row:
             return int(row["channel_id"])
 
-        # 레거시 보정: guild_id NULL
-        legacy = await con.fetchrow(
-            "SELECT channel_id FROM personal_channels WHERE owner_id=$1 AND guild_id IS NULL",
+        # 레거시 보정: guild_id NULL 행은 실제 채널의 길드를 먼저 확인한 뒤 그 길드로 한 번에 붙임
+        legacy = await con.fetchval(
+            "SELECT channel_id FROM personal_channels WHERE owner_id=$1 AND guild_id IS NULL LIMIT 1",
             owner_id
         )
         if legacy:
-            ch_id = int(legacy["channel_id"])
+            ch_id = int(legacy)
             ch = BOT.get_channel(ch_id)
             if ch and getattr(ch, "guild", None):
-                await con.execute(
-                    "UPDATE personal_channels SET guild_id=$1 WHERE channel_id=$2",
-                    ch.guild.id, ch_id
-                )
+                try:
+                    # guild_id IS NULL 조건: 다른 요청이 먼저 보정했으면 0행으로 끝남
+                    await con.execute(
+                        "UPDATE personal_channels SET guild_id=$1 WHERE channel_id=$2 AND guild_id IS NULL",
+                        ch.guild.id, ch_id
+                    )
+                except asyncpg.UniqueViolationError:
+                    return None  # 그 길드에 이미 개인채널이 있음: 레거시 행은 그대로 둠
+                GUILD_ACTIVE.add(ch.guild.id)
                 if ch.guild.id == guild_id:
                     return ch_id
             else:
-                await purge_channel_records(ch_id)
+                await purge_channel_records(ch_id, con=con)
     return None
 
-async def purge_channel_records(channel_id:int):
-    async with PG_POOL.acquire() as con:
-        async with con.transaction():
-            await con.execute("DELETE FROM dashboards WHERE channel_id=$1", channel_id)
-            await con.execute("DELETE FROM blog WHERE channel_id=$1", channel_id)
-            await con.execute("DELETE FROM personal_channels WHERE channel_id=$1", channel_id)
+async def get_message_context(guild_id:int, channel_id:int, *, may_be_personal:bool = True) -> tuple[Optional[int], Optional[int], Optional[int]]:
+    """on_message 라우팅 정보 (nick_ch, create_ch, owner_id). 소유자는 OWNER_TABLE에서 바로 찾음.
+    may_be_personal=False면 (스레드 등 개인채널일 수 없는 채널) 소유자 조회를 생략."""
+    nick_ch, create_ch = await get_settings(guild_id)
+    owner_id = OWNER_TABLE.get(channel_id) if may_be_personal else None
+    return nick_ch, create_ch, owner_id
+
+async def purge_channel_records(channel_id:int, *, con:Optional[asyncpg.Connection] = None):
+    # 단일 문장이라 트랜잭션 없이도 원자적, 왕복 1회
+    await (con or PG_POOL).execute(
+        """
+        WITH d AS (DELETE FROM dashboards WHERE channel_id=$1),
+             b AS (DELETE FROM blog WHERE channel_id=$1)
+        DELETE FROM personal_channels WHERE channel_id=$1
+        """,
+        channel_id
+    )
+    OWNER_TABLE.pop(channel_id, None)
+    BLOG_CACHE.pop(channel_id, None)
+    DASHBOARD_CACHE.pop(channel_id, None)
 
 # ========= 유틸 =========
+_DASH_RE = re.compile(r"-{2,}")
+MAX_URL_LEN = 1024
+
+def blog_url_error(url:str) -> Optional[str]:
+    """블로그 URL 검사. 문제가 있으면 사용자에게 보여줄 메시지, 없으면 None."""
+    if not url.startswith(("http://", "https://")):
+        return "URL은 http(s):// 로 시작해야 해요."
+    if len(url) > MAX_URL_LEN:
+        return f"URL이 너무 길어요. (최대 {MAX_URL_LEN}자)"
+    return None
+
+class _SlugTable(dict):
+    """str.translate용 변환표: 소문자화 + 허용 문자는 그대로, 공백은 '-', 나머지는 삭제. 처음 보는 문자만 계산해 저장."""
+    MAX_ENTRIES = 4096
+
+    @staticmethod
+    def _allowed(ch:str) -> bool:
+        return "a" <= ch <= "z" or "0" <= ch <= "9" or ch in "-_" or "ㄱ" <= ch <= "ㅎ" or "가" <= ch <= "힣"
+
+    def __missing__(self, code:int) -> Optional[str]:
+        ch = chr(code)
+        if ch.isspace():
+            out = "-"
+        else:
+            # lower()가 여러 글자를 낼 수 있어서(예: 'İ') 글자별로 거름
+            out = "".join(c for c in ch.lower() if self._allowed(c)) or None
+        if len(self) < self.MAX_ENTRIES:
+            self[code] = out
+        return out
+
+_SLUG_TABLE = _SlugTable()
+
 def slugify_channel_name(name:str) -> str:
-    s = name.strip().lower()
-    s = re.sub(r"\s+", "-", s)
-    s = re.sub(r"[^a-z0-9ㄱ-ㅎ가-힣\-_]", "", s)
-    s = re.sub(r"-{2,}", "-", s)
+    # 결과는 90자면 충분하므로 긴 입력은 (앞뒤 공백을 먼저 걷어낸 뒤) 잘라서 이후 처리량을 제한
+    s = name.strip()[:256].translate(_SLUG_TABLE)
+    s = _DASH_RE.sub("-", s)
     return s[:90] if s else "personal"
 
+_NICK_TR = str.maketrans({"@": ""})  # 멘션 무력화: @ 자체를 제거 (한 번의 스캔)
+
 def sanitize_nick(nick:str) -> str:
-    nick = nick.strip()
-    nick = nick.replace("@everyone", "everyone").replace("@here", "here")
+    nick = nick.strip().translate(_NICK_TR)
     return nick[:32] if nick else " "
 
 def is_admin_or_mod(member:discord.Member) -> bool:
     return member.guild_permissions.manage_guild or member.guild_permissions.administrator
 
+async def add_reaction_safe(message:discord.Message, emoji:str):
+    with contextlib.suppress(discord.HTTPException):
+        await message.add_reaction(emoji)
+
+async def edit_nick_safe(member:discord.Member, nick:Optional[str]):
+    with contextlib.suppress(discord.Forbidden, discord.HTTPException):
+        await member.edit(nick=nick)
+
+async def delete_message_safe(channel:discord.TextChannel, message_id:Optional[int]):
+    if message_id:
+        with contextlib.suppress(discord.NotFound, discord.Forbidden, discord.HTTPException):
+            await channel.get_partial_message(message_id).delete()
+
+async def delete_later(message:discord.Message, delay:float):
+    await asyncio.sleep(delay)
+    with contextlib.suppress(discord.HTTPException):
+        await message.delete()
+
+async def reply_existing_channel(message:discord.Message, existing:Optional[int]):
+    """이미 개인채널이 있는 사용자에게 ❌ 반응 + 기존 채널 안내."""
+    await add_reaction_safe(message, "❌")
+    ch = message.guild.get_channel(existing) if existing else None
+    if ch:
+        await message.reply(f"{message.author.mention} 이미 개인 채널이 있어요: {ch.mention}", mention_author=False)
+    else:
+        await message.reply(f"{message.author.mention} 이미 개인 채널이 등록되어 있어요. 먼저 /채널삭제로 정리해 주세요.", mention_author=False)
+
+BACKGROUND_TASKS: set[asyncio.Task] = set()
+
+def spawn(coro) -> asyncio.Task:
+    """결과를 기다릴 필요 없는 작업을 백그라운드로 실행 (GC 방지용으로 참조 보관)."""
+    task = asyncio.create_task(coro)
+    BACKGROUND_TASKS.add(task)
+    task.add_done_callback(BACKGROUND_TASKS.discard)
+    return task
+
+DASH_LOCKS: dict[int, asyncio.Lock] = {}  # channel_id -> 갱신 직렬화용
+
 async def ensure_dashboard_at_bottom(channel:discord.TextChannel):
-    """개인 채널 대시보드(해당 채널의 블로그 목록)를 맨 아래로 갱신."""
-    items = await list_blogs(channel.id)  # [(url, title), ...]
+    """개인 채널 대시보드(해당 채널의 블로그 목록)를 맨 아래로 갱신.
+    예약 갱신과 명령어의 직접 갱신이 겹쳐 대시보드가 두 개 올라가지 않도록 채널별로 한 번에 하나만 실행."""
+    async with DASH_LOCKS.setdefault(channel.id, asyncio.Lock()):
+        await _ensure_dashboard_at_bottom(channel)
+
+async def _ensure_dashboard_at_bottom(channel:discord.TextChannel):
+    items, old_id = await get_dashboard_state(channel.id)  # [(url, title), ...], message_id
     if not items:
         # 기록만 남아있을 수 있으니 기존 대시보드 메시지 있으면 지움
-        old_id = await get_dashboard_message_id(channel.id)
         if old_id:
-            with contextlib.suppress(discord.NotFound, discord.Forbidden, discord.HTTPException):
-                msg = await channel.fetch_message(old_id)
-                await msg.delete()
+            await delete_message_safe(channel, old_id)
             await set_dashboard_message_id(channel.id, None)
         return
 
@@ -233,57 +506,146 @@ async def ensure_dashboard_at_bottom(channel:discord.TextChannel):
     embed = discord.Embed(title="📌 블로그 대시보드", description="\n".join(lines), color=0xFF7710)
     embed.set_footer(text="이 채널의 대시보드")
 
-    old_id = await get_dashboard_message_id(channel.id)
     if old_id:
-        with contextlib.suppress(discord.NotFound, discord.Forbidden, discord.HTTPException):
-            msg = await channel.fetch_message(old_id)
-            await msg.delete()
+        if channel.last_message_id == old_id:
+            # 이미 맨 아래면 제자리 수정 (요청 1회, message_id 그대로)
+            try:
+                await channel.get_partial_message(old_id).edit(embed=embed)
+                return
+            except discord.HTTPException:
+                pass  # 지워졌거나 수정 실패 → 새로 올림
+        await delete_message_safe(channel, old_id)
 
     new_msg = await channel.send(embed=embed)
-    await set_dashboard_message_id(channel.id, new_msg.id)
+    DASHBOARD_CACHE[channel.id] = new_msg.id  # 태스크가 돌기 전에 바로 반영해 다음 갱신이 새 id를 보게
+    spawn(persist_dashboard_message_id(channel.id, new_msg.id))
+
+async def persist_dashboard_message_id(channel_id:int, message_id:Optional[int]):
+    """대시보드 id를 백그라운드로 DB에 기록. 캐시는 이미 최신이므로 실패하면 로그만 남김."""
+    try:
+        await set_dashboard_message_id(channel_id, message_id)
+    except Exception as e:
+        print(f"Dashboard id save failed for channel {channel_id}: {e!r}")
+
+PENDING_REFRESH: dict[int, asyncio.TimerHandle] = {}  # channel_id -> 예약된 대시보드 갱신
+DASHBOARD_DELAY = 2.0
+
+def cancel_pending_dashboard(channel_id:int):
+    """예약된 대시보드 갱신 취소 (직접 갱신하거나 채널이 사라질 때)."""
+    pending = PENDING_REFRESH.pop(channel_id, None)
+    if pending:
+        pending.cancel()
+
+def schedule_dashboard(channel:discord.TextChannel, delay:float = DASHBOARD_DELAY):
+    """연속 메시지에는 대시보드를 매번 다시 올리지 않고, 조용해진 뒤 한 번만 갱신."""
+    cancel_pending_dashboard(channel.id)
+
+    def fire():
+        PENDING_REFRESH.pop(channel.id, None)
+        spawn(ensure_dashboard_at_bottom(channel))
+
+    PENDING_REFRESH[channel.id] = asyncio.get_running_loop().call_later(delay, fire)
 
 # ========= 서버 전체 블로그 대시보드 =========
-SERVER_DASHBOARDS: dict[int, tuple[int, Optional[int]]] = {}  # guild_id -> (channel_id, msg_id)
+SERVER_DASHBOARDS: dict[int, tuple[int, Optional[int]]] = {}  # guild_id -> (channel_id, msg_id), server_dashboards 테이블의 캐시
+
+async def load_server_dashboards(*, con:Optional[asyncpg.Connection] = None):
+    rows = await (con or PG_POOL).fetch("SELECT guild_id, channel_id, message_id FROM server_dashboards")
+    for r in rows:
+        SERVER_DASHBOARDS[r["guild_id"]] = (r["channel_id"], r["message_id"])
+
+async def set_server_dashboard(guild_id:int, channel_id:int, message_id:Optional[int], *, con:Optional[asyncpg.Connection] = None):
+    SERVER_DASHBOARDS[guild_id] = (channel_id, message_id)
+    await (con or PG_POOL).execute(
+        "INSERT INTO server_dashboards(guild_id, channel_id, message_id) VALUES($1,$2,$3) "
+        "ON CONFLICT (guild_id) DO UPDATE SET channel_id=EXCLUDED.channel_id, message_id=EXCLUDED.message_id",
+        guild_id, channel_id, message_id
+    )
+
+SERVER_DASH_LOCKS: dict[int, asyncio.Lock] = {}  # guild_id -> 갱신 직렬화용
 
 async def refresh_server_dashboard(guild:discord.Guild):
-    """지정된 채널에 서버 전체 블로그 목록(모든 개인채널의 블로그)을 갱신."""
-    if guild.id not in SERVER_DASHBOARDS:
-        return
-    channel_id, old_msg_id = SERVER_DASHBOARDS[guild.id]
-    channel = guild.get_channel(channel_id)
-    if not channel:
-        return
+    """지정된 채널에 서버 전체 블로그 목록(모든 개인채널의 블로그)을 갱신.
+    길드별로 한 번에 하나만 실행해서 동시 갱신으로 메시지가 두 개 올라가는 일을 막음."""
+    async with SERVER_DASH_LOCKS.setdefault(guild.id, asyncio.Lock()):
+        await _refresh_server_dashboard(guild)
+
+# 길드별 블로그 목록 (제목 포함). 줄 조립까지 SQL에서 해서 길드당 TEXT 하나만 받음.
+# 길드 하나 갱신과 시작 시 일괄 재구성이 같은 쿼리를 써서 모양이 어긋나지 않게 함
+_SERVER_LINKS_SQL = """
+SELECT p.guild_id,
+       string_agg(
+           format('🔗 [%s](%s) - <@%s>', COALESCE(b.title, '열기'), b.url, p.owner_id),
+           E'\\n' ORDER BY p.owner_id, b.url
+       ) AS links
+FROM blog b
+JOIN personal_channels p ON p.channel_id = b.channel_id
+WHERE p.guild_id = ANY($1::bigint[])
+GROUP BY p.guild_id
+"""
 
-    # DB에서 서버 내 모든 블로그 수집 (제목 포함)
-    async with PG_POOL.acquire() as con:
-        rows = await con.fetch(
-            """
-            SELECT b.url, COALESCE(b.title, '열기') AS title, p.owner_id
-            FROM blog b
-            JOIN personal_channels p ON p.channel_id = b.channel_id
-            WHERE p.guild_id = $1
-            ORDER BY p.owner_id, b.url
-            """,
-            guild.id,
-        )
+def server_dashboard_target(guild:discord.Guild) -> Optional[tuple[discord.TextChannel, Optional[int]]]:
+    """서버 대시보드 (채널, 기존 message_id). 지정 안 됐거나 채널이 없으면 None."""
+    entry = SERVER_DASHBOARDS.get(guild.id)
+    if not entry:
+        return None
+    channel = guild.get_channel(entry[0])
+    return (channel, entry[1]) if channel else None
+
+async def _refresh_server_dashboard(guild:discord.Guild):
+    target = server_dashboard_target(guild)
+    if not target:
+        return
+    row = await PG_POOL.fetchrow(_SERVER_LINKS_SQL, [guild.id])
+    await _publish_server_dashboard(guild, *target, row["links"] if row else None)
 
-    desc = "등록된 블로그가 없습니다." if not rows else \
-        "\n".join(f"🔗 [{r['title']}]({r['url']}) - <@{r['owner_id']}>" for r in rows)
+async def _publish_server_dashboard(guild:discord.Guild, channel:discord.TextChannel, old_msg_id:Optional[int], links:Optional[str]):
+    """미리 조립된 목록으로 서버 대시보드 메시지를 수정/전송. 호출 측에서 길드 락을 잡고 있어야 함."""
+    desc = links or "등록된 블로그가 없습니다."
 
     embed = discord.Embed(title="📑 서버 블로그 목록", description=desc, color=0x00BFFF)
 
     if old_msg_id:
-        with contextlib.suppress(discord.NotFound, discord.Forbidden, discord.HTTPException):
-            msg = await channel.fetch_message(old_msg_id)
-            await msg.delete()
+        # 서버 대시보드 채널은 순서가 중요하지 않으므로 항상 제자리 수정
+        try:
+            await channel.get_partial_message(old_msg_id).edit(embed=embed)
+            return
+        except discord.HTTPException:
+            await delete_message_safe(channel, old_msg_id)
 
     msg = await channel.send(embed=embed)
-    SERVER_DASHBOARDS[guild.id] = (channel.id, msg.id)
+    await set_server_dashboard(guild.id, channel.id, msg.id)
+
+async def refresh_all_server_dashboards():
+    """시작 시 등록된 모든 서버 대시보드를 한 번에 재구성. 길드별 쿼리 대신 GROUP BY 한 번으로 목록을 받음."""
+    if not SERVER_DASHBOARDS:
+        return
+    rows = await PG_POOL.fetch(_SERVER_LINKS_SQL, list(SERVER_DASHBOARDS))
+    links_by_guild = {r["guild_id"]: r["links"] for r in rows}
+
+    async def publish(guild_id:int):
+        guild = BOT.get_guild(guild_id)
+        if not guild:
+            return
+        async with SERVER_DASH_LOCKS.setdefault(guild_id, asyncio.Lock()):
+            target = server_dashboard_target(guild)
+            if target:
+                await _publish_server_dashboard(guild, *target, links_by_guild.get(guild_id))
+
+    # 한 길드의 전송 실패가 나머지 길드 갱신을 막지 않도록 예외는 모아서 출력
+    guild_ids = list(SERVER_DASHBOARDS)
+    results = await asyncio.gather(*(publish(gid) for gid in guild_ids), return_exceptions=True)
+    for gid, result in zip(guild_ids, results):
+        if isinstance(result, Exception):
+            print(f"Server dashboard refresh failed for guild {gid}: {result!r}")
 
 # ========= 헬스 서버 & DB 재시도 =========
+_HEALTH_BODY = b"ok"  # 매 요청마다 문자열 인코딩하지 않도록 미리 bytes로
+
 async def run_health_server():
     async def health(_):
-        return web.Response(text="ok")
+        # Response 객체는 요청마다 새로 만들어야 함(aiohttp는 한 번 보낸 응답을 재사용 불가)
+        return web.Response(body=_HEALTH_BODY, content_type="text/plain")
     app = web.Application()
     app.router.add_get("/healthz", health)
     runner = web.AppRunner(app)
@@ -294,82 +656,115 @@ async def run_health_server():
 
 async def connect_db_with_retry(max_attempts=8):
     """외부 DB 연결 안정화를 위해 백오프 재시도."""
-    global PG_POOL
-    if not DATABASE_URL:
+    global PG_POOL, DB_READY
+    if not DB_URL:
         print("DATABASE_URL is empty; DB features disabled")
         return
+    ssl_ctx = make_ssl_ctx(DB_URL)
     delay = 2
     for attempt in range(1, max_attempts + 1):
         try:
             PG_POOL = await asyncpg.create_pool(
-                DATABASE_URL,
-                min_size=1,
-                max_size=5,
-                ssl=SSL_CTX,
-                command_timeout=60,
-                statement_cache_size=0,   # pgbouncer(pooler) 호환
+                DB_URL,
+                min_size=PG_POOL_MIN,   # create_pool이 min_size만큼 미리 연결해 둠(첫 메시지 지연 방지)
+                max_size=PG_POOL_MAX,
+                max_inactive_connection_lifetime=300,  # 한가할 때 남는 연결은 5분 후 정리
+                ssl=ssl_ctx,
+                command_timeout=10,     # 멈춘 쿼리 하나가 풀을 잡고 있지 않도록
+                statement_cache_size=DB_STATEMENT_CACHE_SIZE,  # 직접 연결 명시가 없으면 0 (pgbouncer 호환)
+                max_cached_statement_lifetime=0,               # 캐시된 prepared statement 만료 없음
+                timeout=10,             # 연결 수립 타임아웃
             )
+            # 반쯤 열린 연결이면 여기서 바로 실패시킴
+            async with PG_POOL.acquire() as con:
+                await con.fetchval("SELECT 1")
             await init_db()
+            # 시작 시 캐시 적재는 연결 하나로
+            async with PG_POOL.acquire() as con:
+                await load_settings(con=con)
+                await load_owners(con=con)
+                await load_active_guilds(con=con)
+                await load_server_dashboards(con=con)
+            DB_READY = True
             print("DB pool ready")
             return
         except Exception as e:
             print(f"DB connect attempt {attempt} failed: {e}")
-            await asyncio.sleep(delay)
+            if PG_POOL is not None:
+                with contextlib.suppress(Exception):
+                    await PG_POOL.close()
+                PG_POOL = None
+            # 여러 인스턴스가 같은 주기로 재시도하지 않도록 지터
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
             delay = min(delay * 2, 30)
     print("DB connect failed; continuing without DB")
 
 # ========= 봇 이벤트 =========
+_SYNCED_ONCE = False  # on_ready는 게이트웨이 재연결마다 다시 호출됨
+DB_CONNECT_LOCK = asyncio.Lock()  # 재시도 중에 재연결 on_ready가 와도 연결 시도는 하나만
+
 @BOT.event
 async def on_ready():
+    global _SYNCED_ONCE
     print(f"Logged in as {BOT.user} (ID: {BOT.user.id})")
 
-    # 슬래시 명령어 동기화
-    try:
-        if TEST_GUILD_ID:
-            guild = discord.Object(id=TEST_GUILD_ID)
-            BOT.tree.copy_global_to(guild=guild)
-            synced = await BOT.tree.sync(guild=guild)
-            print(f"Slash synced to guild {TEST_GUILD_ID}: {len(synced)} cmds")
-        else:
-            synced = await BOT.tree.sync()
-            print(f"Slash synced globally: {len(synced)} cmds")
-    except Exception as e:
-        print("Sync error:", e)
+    # 슬래시 명령어 동기화 (성공할 때까지 on_ready마다 시도, 성공 후에는 생략)
+    if not _SYNCED_ONCE:
+        try:
+            if TEST_GUILD_ID:
+                guild = discord.Object(id=TEST_GUILD_ID)
+                BOT.tree.copy_global_to(guild=guild)
+                synced = await BOT.tree.sync(guild=guild)
+                print(f"Slash synced to guild {TEST_GUILD_ID}: {len(synced)} cmds")
+            else:
+                synced = await BOT.tree.sync()
+                print(f"Slash synced globally: {len(synced)} cmds")
+            _SYNCED_ONCE = True
+        except Exception as e:
+            print("Sync error:", e)
+
+    # DB 연결: 풀이 준비될 때까지는 on_ready마다 다시 시도 (부팅 시 DB 장애로 재시도가 끝났어도 복구 가능)
+    if DB_READY or DB_CONNECT_LOCK.locked():
+        return
+    async with DB_CONNECT_LOCK:
+        await connect_db_with_retry()
 
-    # DB 연결
-    await connect_db_with_retry()
+        # 재시작 사이에 바뀐 목록 반영
+        if DB_READY:
+            await refresh_all_server_dashboards()
 
 @BOT.event
 async def on_message(message:discord.Message):
     if message.author.bot or not message.guild:
         return
-    if PG_POOL is None:
+    if not DB_READY:
         return
+    if message.guild.id not in GUILD_ACTIVE:
+        return  # 아무 기능도 설정 안 된 길드: DB/캐시 조회 없이 종료
 
-    nick_ch, create_ch = await get_settings(message.guild.id)
+    # 개인채널은 항상 일반 텍스트 채널로 만들어지므로 스레드/음성채널 채팅 등은 소유자 조회 불필요
+    nick_ch, create_ch, owner_id = await get_message_context(
+        message.guild.id, message.channel.id,
+        may_be_personal=isinstance(message.channel, discord.TextChannel),
+    )
 
     # 닉변 채널
     if nick_ch and message.channel.id == nick_ch:
         new_nick = sanitize_nick(message.content)
-        with contextlib.suppress(discord.Forbidden, discord.HTTPException):
-            await message.author.edit(nick=new_nick.strip() or None)
-        with contextlib.suppress(discord.HTTPException):
-            await message.add_reaction("✅")
-            await asyncio.sleep(1.0)
-            await message.delete()
+        # 닉 변경과 체크 반응은 서로 무관하므로 동시에
+        await asyncio.gather(
+            edit_nick_safe(message.author, new_nick.strip() or None),
+            add_reaction_safe(message, "✅"),
+        )
+        spawn(delete_later(message, 1.0))
         return
 
     # 개인채널 생성 채널 (같은 카테고리에 생성)
     if create_ch and message.channel.id == create_ch:
+        # 채널을 만들기 전에 먼저 확인 (레거시 행 보정 포함). 채널 생성 레이트리밋/감사 로그 낭비 방지
         existing = await get_channel_by_owner(message.guild.id, message.author.id)
         if existing:
-            with contextlib.suppress(discord.HTTPException):
-                await message.add_reaction("❌")
-            ch = message.guild.get_channel(existing)
-            if ch:
-                await message.reply(f"{message.author.mention} 이미 개인 채널이 있어요: {ch.mention}", mention_author=False)
-            else:
-                await message.reply(f"{message.author.mention} 이미 개인 채널이 등록되어 있어요. 먼저 /채널삭제로 정리해 주세요.", mention_author=False)
+            await reply_existing_channel(message, existing)
             return
 
         name = slugify_channel_name(message.content or f"{message.author.name}-channel")
@@ -386,24 +781,52 @@ async def on_message(message:discord.Message):
             reason=f"개인채널 생성 by {message.author}",
             category=parent_category
         )
-        await set_personal_channel(new_channel.id, message.author.id, message.guild.id)
-        await new_channel.send(
-            f"{message.author.mention} 님의 개인 채널이 생성되었습니다.\n"
-            f"- 다른 유저: **보기만 가능**\n"
-            f"- 채널 이름 변경: 직접 변경 가능(권한 부여됨)\n"
-            f"- 블로그 등록: /블로그등록 url:<주소> title:<표시이름(선택)> , 삭제: /블로그삭제 url:<주소>\n"
-            f"- 전체 삭제: /블로그삭제전체"
+        # 동시 요청 경쟁은 유니크 제약으로 막음: 진 쪽은 방금 만든 채널을 지움
+        if not await set_personal_channel(new_channel.id, message.author.id, guild.id):
+            with contextlib.suppress(discord.Forbidden, discord.HTTPException):
+                await new_channel.delete(reason="이미 개인 채널이 있음")
+            await reply_existing_channel(message, await get_channel_by_owner(guild.id, message.author.id))
+            return
+
+        # 채널이 생긴 뒤의 안내 메시지 / 체크 반응은 서로 독립적이라 동시에 처리
+        await asyncio.gather(
+            new_channel.send(
+                f"{message.author.mention} 님의 개인 채널이 생성되었습니다.\n"
+                f"- 다른 유저: **보기만 가능**\n"
+                f"- 채널 이름 변경: 직접 변경 가능(권한 부여됨)\n"
+                f"- 블로그 등록: /블로그등록 url:<주소> title:<표시이름(선택)> , 삭제: /블로그삭제 url:<주소>\n"
+                f"- 전체 삭제: /블로그삭제전체"
+            ),
+            add_reaction_safe(message, "✅"),
         )
-        with contextlib.suppress(discord.HTTPException):
-            await message.add_reaction("✅")
         return
 
     # 개인채널이면 대시보드 최신 유지
-    owner_id = await get_owner(message.channel.id)
     if owner_id:
-        await ensure_dashboard_at_bottom(message.channel)
+        schedule_dashboard(message.channel)
+
+@BOT.event
+async def on_guild_join(guild:discord.Guild):
+    if DB_READY:
+        await get_settings(guild.id)  # 재초대된 길드면 기존 설정을 캐시에 올림
+
+@BOT.event
+async def on_guild_channel_delete(channel:discord.abc.GuildChannel):
+    # 사라진 채널로 예약 갱신이 send 하지 않도록 타이머 취소 + 채널별 캐시 전부 정리
+    cancel_pending_dashboard(channel.id)
+    OWNER_TABLE.pop(channel.id, None)
+    BLOG_CACHE.pop(channel.id, None)
+    DASHBOARD_CACHE.pop(channel.id, None)
+    DASH_LOCKS.pop(channel.id, None)
 
 # ========= 명령어 =========
+async def reply_db_not_ready(interaction:discord.Interaction) -> bool:
+    """DB(캐시 적재 포함)가 아직 준비 전이면 안내하고 True. 명령어 맨 앞에서 호출."""
+    if DB_READY:
+        return False
+    await interaction.response.send_message("봇이 아직 준비 중이에요. 잠시 후 다시 시도해 주세요.", ephemeral=True)
+    return True
+
 class GuildAdmin(app_commands.Group): pass
 admin = GuildAdmin(name="설정", description="관리자 전용 설정")
 
@@ -412,6 +835,8 @@ admin = GuildAdmin(name="설정", description="관리자 전용 설정")
 @app_commands.describe(channel="닉변 채널")
 @app_commands.default_permissions(manage_guild=True)
 async def set_nick_channel(interaction, channel:discord.TextChannel):
+    if await reply_db_not_ready(interaction):
+        return
     await set_setting(interaction.guild.id, "nick_channel_id", channel.id)
     await interaction.response.send_message(f"닉변 채널이 {channel.mention} 로 설정되었습니다.", ephemeral=True)
 
@@ -420,6 +845,8 @@ async def set_nick_channel(interaction, channel:discord.TextChannel):
 @app_commands.describe(channel="개인채널 생성 채널")
 @app_commands.default_permissions(manage_guild=True)
 async def set_create_channel(interaction, channel:discord.TextChannel):
+    if await reply_db_not_ready(interaction):
+        return
     await set_setting(interaction.guild.id, "create_channel_id", channel.id)
     await interaction.response.send_message(f"개인채널 생성 채널이 {channel.mention} 로 설정되었습니다.", ephemeral=True)
 
@@ -430,71 +857,98 @@ BOT.tree.add_command(admin)
 @app_commands.guild_only()
 @app_commands.describe(url="블로그 주소 (https://...)", title="대시보드 표시 이름(선택)")
 async def blog_register(interaction: discord.Interaction, url: str, title: Optional[str] = None):
+    if await reply_db_not_ready(interaction):
+        return
     owner_id = await get_owner(interaction.channel.id)
     if not owner_id or owner_id != interaction.user.id:
         return await interaction.response.send_message("본인 개인 채널에서만 등록할 수 있어요.", ephemeral=True)
-    if not re.match(r"^https?://", url):
-        return await interaction.response.send_message("URL은 http(s):// 로 시작해야 해요.", ephemeral=True)
+    error = blog_url_error(url)
+    if error:
+        return await interaction.response.send_message(error, ephemeral=True)
 
     await interaction.response.defer(ephemeral=True)
     await add_blog(interaction.channel.id, url, title)
-    await ensure_dashboard_at_bottom(interaction.channel)
-    await refresh_server_dashboard(interaction.guild)
-    await interaction.followup.send("블로그가 등록되었습니다 ✅", ephemeral=True)
+    cancel_pending_dashboard(interaction.channel.id)  # 바로 갱신하므로 예약분은 불필요
+    # 두 대시보드는 서로 다른 채널이라 동시에 갱신 가능
+    await asyncio.gather(
+        ensure_dashboard_at_bottom(interaction.channel),
+        refresh_server_dashboard(interaction.guild),
+        interaction.followup.send("블로그가 등록되었습니다 ✅", ephemeral=True),
+    )
 
 @BOT.tree.command(name="블로그삭제", description="현재 개인 채널에서 특정 블로그를 삭제합니다.")
 @app_commands.guild_only()
 @app_commands.describe(url="삭제할 블로그 주소 (https://...)")
 async def blog_remove(interaction: discord.Interaction, url: str):
+    if await reply_db_not_ready(interaction):
+        return
     owner_id = await get_owner(interaction.channel.id)
     if not owner_id or owner_id != interaction.user.id:
         return await interaction.response.send_message("본인 개인 채널에서만 삭제할 수 있어요.", ephemeral=True)
 
     await interaction.response.defer(ephemeral=True)
     await remove_blog(interaction.channel.id, url)
-    await ensure_dashboard_at_bottom(interaction.channel)
-    await refresh_server_dashboard(interaction.guild)
-    await interaction.followup.send("블로그가 삭제되었습니다 ✅", ephemeral=True)
+    cancel_pending_dashboard(interaction.channel.id)  # 바로 갱신하므로 예약분은 불필요
+    # 두 대시보드는 서로 다른 채널이라 동시에 갱신 가능
+    await asyncio.gather(
+        ensure_dashboard_at_bottom(interaction.channel),
+        refresh_server_dashboard(interaction.guild),
+        interaction.followup.send("블로그가 삭제되었습니다 ✅", ephemeral=True),
+    )
 
 @BOT.tree.command(name="블로그삭제전체", description="현재 개인 채널의 모든 블로그를 삭제합니다.")
 @app_commands.guild_only()
 async def blog_clear(interaction: discord.Interaction):
+    if await reply_db_not_ready(interaction):
+        return
     owner_id = await get_owner(interaction.channel.id)
     if not owner_id or owner_id != interaction.user.id:
         return await interaction.response.send_message("본인 개인 채널에서만 삭제할 수 있어요.", ephemeral=True)
 
     await interaction.response.defer(ephemeral=True)
-    await clear_blogs(interaction.channel.id)
-    await ensure_dashboard_at_bottom(interaction.channel)
-    await refresh_server_dashboard(interaction.guild)
-    await interaction.followup.send("모든 블로그가 삭제되었습니다 ✅", ephemeral=True)
+    old_id = await clear_blogs(interaction.channel.id)
+    cancel_pending_dashboard(interaction.channel.id)  # 바로 갱신하므로 예약분은 불필요
+    await asyncio.gather(
+        delete_message_safe(interaction.channel, old_id),
+        refresh_server_dashboard(interaction.guild),
+        interaction.followup.send("모든 블로그가 삭제되었습니다 ✅", ephemeral=True),
+    )
 
 @BOT.tree.command(name="블로그목록", description="서버 전체 블로그 목록을 특정 채널에 게시합니다. (관리자 전용)")
 @app_commands.guild_only()
 @app_commands.checks.has_permissions(manage_guild=True)
 @app_commands.describe(channel="서버 블로그 대시보드를 표시할 채널")
 async def blog_list(interaction: discord.Interaction, channel: discord.TextChannel):
-    SERVER_DASHBOARDS[interaction.guild.id] = (channel.id, None)
+    if await reply_db_not_ready(interaction):
+        return
+    await set_server_dashboard(interaction.guild.id, channel.id, None)
     await refresh_server_dashboard(interaction.guild)
     await interaction.response.send_message(f"{channel.mention} 에 서버 전체 블로그 목록을 게시했습니다.", ephemeral=True)
 
+async def delete_channel_later(channel:discord.TextChannel, delay:float, reason:str):
+    await asyncio.sleep(delay)
+    await purge_channel_records(channel.id)
+    with contextlib.suppress(discord.Forbidden, discord.HTTPException):
+        await channel.delete(reason=reason)
+
 @BOT.tree.command(name="채널삭제", description="현재 개인 채널을 삭제합니다.")
 @app_commands.guild_only()
 async def delete_personal_channel(interaction: discord.Interaction):
+    if await reply_db_not_ready(interaction):
+        return
     owner_id = await get_owner(interaction.channel.id)
     if not owner_id or owner_id != interaction.user.id:
         return await interaction.response.send_message("본인 개인 채널에서만 사용할 수 있어요.", ephemeral=True)
     await interaction.response.send_message("이 채널을 삭제합니다. 3초 후 삭제돼요.", ephemeral=True)
-    await asyncio.sleep(3)
-    await purge_channel_records(interaction.channel.id)
-    with contextlib.suppress(discord.Forbidden, discord.HTTPException):
-        await interaction.channel.delete(reason=f"/채널삭제 by {interaction.user}")
+    spawn(delete_channel_later(interaction.channel, 3.0, reason=f"/채널삭제 by {interaction.user}"))
 
 @BOT.tree.command(name="채널삭제강제", description="특정 유저의 개인 채널 기록을 DB에서 제거합니다. (관리자 전용)")
 @app_commands.guild_only()
 @app_commands.checks.has_permissions(manage_guild=True)
 @app_commands.describe(user="개인 채널 소유자")
 async def force_delete_channel(interaction: discord.Interaction, user: discord.User):
+    if await reply_db_not_ready(interaction):
+        return
     ch_id = await get_channel_by_owner(interaction.guild.id, user.id)
     if not ch_id:
         return await interaction.response.send_message(f"{user.mention} 님의 개인 채널 기록이 없습니다.", ephemeral=True)
@@ -511,4 +965,9 @@ async def main():
     )
 
 if __name__ == "__main__":
+    try:
+        import uvloop  # 리눅스 배포 환경에서만 설치됨 (윈도우 미지원)
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())